@@ -196,46 +196,51 @@ class AnalysisTask(QgsTask):
         """Run cadastral point-polygon topology analysis"""
         self._emit_log('info', '📍 Cadastral Point-Polygon Topology Analysis')
         
-        # Check 1: ID matching
-        self.setProgress(int((current_step / total_steps) * 100))
-        self._emit_log('info', '🔍 Checking ID associations (point ↔ polygon)...')
-        
-        results = self.cadastral_analyzer.check_id_matching(point_layer, polygon_layer)
-        self.results.extend(results)
-        current_step += 1
-        
-        if self.isCanceled():
-            return current_step
-        
-        # Check 2: Vertex count
-        self.setProgress(int((current_step / total_steps) * 100))
-        self._emit_log('info', '🔍 Validating vertex counts...')
-        
-        results = self.cadastral_analyzer.check_vertex_count(point_layer, polygon_layer)
-        self.results.extend(results)
-        current_step += 1
-        
-        if self.isCanceled():
-            return current_step
-        
-        # Check 3: Coordinate precision
-        self.setProgress(int((current_step / total_steps) * 100))
-        self._emit_log('info', '🔍 Checking point-vertex coordinate match...')
-        
-        results = self.cadastral_analyzer.check_coordinate_precision(point_layer, polygon_layer)
-        self.results.extend(results)
-        current_step += 1
-        
-        if self.isCanceled():
-            return current_step
-        
-        # Check 4: Shared vertices
-        self.setProgress(int((current_step / total_steps) * 100))
-        self._emit_log('info', '🔍 Validating shared vertices (contiguous parcels)...')
-        
-        results = self.cadastral_analyzer.check_shared_vertices(polygon_layer, point_layer)
-        self.results.extend(results)
-        current_step += 1
+        # The per-layer caches are released however the checks end
+        # (completion, cancellation or an exception)
+        try:
+            # Check 1: ID matching
+            self.setProgress(int((current_step / total_steps) * 100))
+            self._emit_log('info', '🔍 Checking ID associations (point ↔ polygon)...')
+            
+            results = self.cadastral_analyzer.check_id_matching(point_layer, polygon_layer)
+            self.results.extend(results)
+            current_step += 1
+            
+            if self.isCanceled():
+                return current_step
+            
+            # Check 2: Vertex count
+            self.setProgress(int((current_step / total_steps) * 100))
+            self._emit_log('info', '🔍 Validating vertex counts...')
+            
+            results = self.cadastral_analyzer.check_vertex_count(point_layer, polygon_layer)
+            self.results.extend(results)
+            current_step += 1
+            
+            if self.isCanceled():
+                return current_step
+            
+            # Check 3: Coordinate precision
+            self.setProgress(int((current_step / total_steps) * 100))
+            self._emit_log('info', '🔍 Checking point-vertex coordinate match...')
+            
+            results = self.cadastral_analyzer.check_coordinate_precision(point_layer, polygon_layer)
+            self.results.extend(results)
+            current_step += 1
+            
+            if self.isCanceled():
+                return current_step
+            
+            # Check 4: Shared vertices
+            self.setProgress(int((current_step / total_steps) * 100))
+            self._emit_log('info', '🔍 Validating shared vertices (contiguous parcels)...')
+            
+            results = self.cadastral_analyzer.check_shared_vertices(polygon_layer, point_layer)
+            self.results.extend(results)
+            current_step += 1
+        finally:
+            self.cadastral_analyzer.clear_cache()
         
         return current_step
     
@@ -235,15 +235,32 @@ class PresetManager:
         if distance < eps:
             return tr("Low")
 
+        breakpoints, labels = PresetManager.get_proximity_thresholds(preset)
+        for breakpoint, label in zip(breakpoints, labels):
+            if distance <= breakpoint:
+                return label
+        return labels[-1]
+
+    @staticmethod
+    def get_proximity_thresholds(preset: dict) -> tuple:
+        """
+        Point proximity breakpoints and labels (single source for
+        classify_point_proximity and bulk classification).
+        
+        For distances at or above epsilon, labels[bisect_left(breakpoints, d)]
+        equals classify_point_proximity(d, ...) as long as breakpoints are sorted.
+        
+        :param preset: Classification preset
+        :return: Tuple (breakpoints, labels) with len(labels) == len(breakpoints) + 1
+        """
         thresholds = preset.get('points', {})
-        if distance <= thresholds.get('critical', 0.5):
-            return tr("Critical")
-        elif distance <= thresholds.get('high', 1.5):
-            return tr("High")
-        elif distance <= thresholds.get('moderate', 5.0):
-            return tr("Moderate")
-        else:
-            return tr("Low")
+        breakpoints = [
+            thresholds.get('critical', 0.5),
+            thresholds.get('high', 1.5),
+            thresholds.get('moderate', 5.0),
+        ]
+        labels = [tr("Critical"), tr("High"), tr("Moderate"), tr("Low")]
+        return breakpoints, labels
 
     @staticmethod
     def classify_polygon_overlap(area: float, geom1_area: float, geom2_area: float,
@@ -11,27 +11,31 @@ Version: 1.0.0
 
 import os
 import tempfile
+from itertools import islice
 from typing import List, Tuple, Optional, Dict, Any
 from qgis.core import (
     QgsVectorLayer, QgsFeature, QgsField, QgsProject, QgsVectorFileWriter,
-    QgsWkbTypes, QgsGeometry, QgsCoordinateTransformContext, QgsSymbol,
-    QgsRendererRange, QgsGraduatedSymbolRenderer
+    QgsFeatureRequest, QgsExpression, QgsWkbTypes, QgsGeometry, QgsCoordinateTransformContext, QgsSymbol,
+    QgsSpatialIndex, QgsFeatureSink, QgsVectorDataProvider,
+    QgsRendererCategory, QgsCategorizedSymbolRenderer
 )
 from qgis.PyQt.QtCore import QVariant
 from qgis.PyQt.QtGui import QColor
 from .utils import log_message, tr, ensure_parent_dir, TempLayerTracker
 
+# Number of features handed to a data provider per addFeatures() call
+FEATURE_BATCH_SIZE = 5000
+
+# Multipart cutters with at least this many parts are indexed part by part
+TRIM_PART_INDEX_MIN_PARTS = 16
+
 # ===============LAYER COMPATIBILITY & MERGING========================
 
 def check_layers_compatibility(layers: List[QgsVectorLayer]) -> Tuple[bool, Optional[str]]:
     """Check if layers can be merged (same geometry type)"""
-    if not layers or len(layers) < 2:
-        return True, None
-    
-    first_geom_type = layers[0].geometryType()
-    for layer in layers[1:]:
-        if layer.geometryType() != first_geom_type:
-            return False, tr("Incompatible geometry types")
+    geom_types = {layer.geometryType() for layer in layers or []}
+    if len(geom_types) > 1:
+        return False, tr("Incompatible geometry types")
     
     return True, None
 
@@ -52,15 +56,16 @@ def merge_layers_to_temp(layers: List[QgsVectorLayer],
         if not ok:
             return None, msg
         
-        # Find common fields
-        common_fields = None
-        for layer in layers:
-            layer_field_dict = {field.name(): field.type() for field in layer.fields()}
-            if common_fields is None:
-                common_fields = layer_field_dict
-            else:
-                common_fields = {name: ftype for name, ftype in common_fields.items()
-                                if name in layer_field_dict and layer_field_dict[name] == ftype}
+        # Find common fields: (name, type) signatures shared by every layer
+        schemas = [tuple((field.name(), field.type()) for field in layer.fields())
+                   for layer in layers]
+        same_schema = all(schema == schemas[0] for schema in schemas[1:])
+        if same_schema:
+            # Identical schemas (e.g. versioned copies): every field is common
+            common_fields = {name for name, _ in schemas[0]}
+        else:
+            signatures = [frozenset(schema) for schema in schemas]
+            common_fields = {name for name, _ in signatures[0].intersection(*signatures[1:])}
         
         if not common_fields:
             return None, tr("No common fields found")
@@ -78,54 +83,81 @@ def merge_layers_to_temp(layers: List[QgsVectorLayer],
         provider = temp_layer.dataProvider()
         
         # Add common fields + source tracking
-        fields_to_add = []
-        for field_name in sorted(common_fields.keys()):
-            for layer in layers:
-                field = layer.fields().field(field_name)
-                if field:
-                    fields_to_add.append(field)
-                    break
+        # Common fields exist in every layer, so the first layer's definitions
+        # (in its own field order) are enough
+        fields_to_add = [field for field in first_layer.fields()
+                         if field.name() in common_fields]
         fields_to_add.append(QgsField("__source_layer_id", QVariant.String))
         fields_to_add.append(QgsField("__source_layer_name", QVariant.String))
         provider.addAttributes(fields_to_add)
         temp_layer.updateFields()
+        merged_fields = temp_layer.fields()
+        field_count = merged_fields.count()
+        tracer_idx = merged_fields.indexOf("__source_layer_id")
+        name_idx = merged_fields.indexOf("__source_layer_name")
+        # The provider may skip or rename fields it cannot store: a missing
+        # index would make attr_map overwrite the tracer slots
+        missing = sorted(name for name in common_fields if merged_fields.indexOf(name) < 0)
+        missing += [name for name, idx in (("__source_layer_id", tracer_idx),
+                                           ("__source_layer_name", name_idx)) if idx < 0]
+        if missing:
+            return None, tr("Unable to create merged fields: {}").format(", ".join(missing))
+        make_feature = QgsFeature  # local binding for the per-feature loop
+        template = QgsFeature(merged_fields)  # copied per feature, fields bound once
+        # Same field order everywhere and every source field actually added
+        # (the provider may skip unsupported or clashing fields): source
+        # attributes can be copied as a block
+        copy_block = (same_schema and field_count == len(schemas[0]) + 2
+                      and (tracer_idx, name_idx) == (field_count - 2, field_count - 1))
         
-        # Merge features
-        all_features = []
-        for source_layer in layers:
-            source_layer_id = source_layer.id()
-            source_layer_name = source_layer.name()
-            
-            for feature in source_layer.getFeatures():
-                if feature.geometry() is None or feature.geometry().isEmpty():
-                    continue
-                
-                new_feat = QgsFeature(temp_layer.fields())
-                
-                # Copy common attributes
-                for field_name in common_fields.keys():
-                    try:
-                        idx = temp_layer.fields().indexOf(field_name)
-                        if idx >= 0:
-                            new_feat.setAttribute(idx, feature[field_name])
-                    except:
-                        pass
+        def merged_features():
+            # Stream merged features; only one batch is held in memory at a time
+            for source_layer in layers:
+                source_layer_id = source_layer.id()
+                source_layer_name = source_layer.name()
+                src_fields = source_layer.fields()
+                attr_map = [(src_fields.indexOf(name), merged_fields.indexOf(name))
+                            for name in common_fields]
                 
-                # Add source tracking
-                tracer_idx = temp_layer.fields().indexOf("__source_layer_id")
-                name_idx = temp_layer.fields().indexOf("__source_layer_name")
-                if tracer_idx >= 0:
-                    new_feat.setAttribute(tracer_idx, source_layer_id)
-                if name_idx >= 0:
-                    new_feat.setAttribute(name_idx, source_layer_name)
-                
-                new_feat.setGeometry(feature.geometry())
-                all_features.append(new_feat)
+                for feature in source_layer.getFeatures():
+                    if not feature.hasGeometry():
+                        continue
+                    geom = feature.geometry()
+                    if geom.isEmpty():
+                        continue
+                    
+                    new_feat = make_feature(template)
+                    
+                    # Copy common attributes and add source tracking
+                    attrs = feature.attributes()
+                    if copy_block:
+                        new_attrs = attrs + [source_layer_id, source_layer_name]
+                    else:
+                        new_attrs = [None] * field_count
+                        for src_idx, dst_idx in attr_map:
+                            new_attrs[dst_idx] = attrs[src_idx]
+                        new_attrs[tracer_idx] = source_layer_id
+                        new_attrs[name_idx] = source_layer_name
+                    new_feat.setAttributes(new_attrs)
+                    
+                    new_feat.setGeometry(geom)
+                    yield new_feat
         
-        if not all_features:
+        # Merge features, flushing to the provider in fixed-size batches
+        features = merged_features()
+        merged_count = 0
+        while True:
+            batch = list(islice(features, FEATURE_BATCH_SIZE))
+            if not batch:
+                break
+            added, _ = provider.addFeatures(batch, QgsFeatureSink.FastInsert)
+            if not added:
+                return None, tr("Unable to add merged features: {}").format(provider.lastError())
+            merged_count += len(batch)
+        
+        if not merged_count:
             return None, tr("No valid features to merge")
         
-        provider.addFeatures(all_features)
         temp_layer.updateExtents()
         
         # Track for cleanup
@@ -140,6 +172,9 @@ def merge_layers_to_temp(layers: List[QgsVectorLayer],
 
 # =================LAYER CORRECTOR WITH SAFE TRANSACTIONS=======================================
 
+# Maximum number of values per IN (...) filter sent to the provider
+FILTER_CHUNK_SIZE = 5000
+
 class LayerCorrector:
     """
     Apply corrections to layers with backup and transaction safety
@@ -166,7 +201,9 @@ class LayerCorrector:
             backup_name = f"backup_{self.layer.name()}_{os.getpid()}.gpkg"
             self.backup_path = os.path.join(temp_dir, backup_name)
             
-            success, error = export_vector_layer(self.layer, self.backup_path, "GPKG")
+            # Backups are only read back sequentially, no spatial index needed
+            success, error = export_vector_layer(self.layer, self.backup_path, "GPKG",
+                                                 spatial_index=False)
             if success:
                 log_message('info', f"Backup created: {self.backup_path}")
                 return True, None
@@ -187,10 +224,16 @@ class LayerCorrector:
             if not backup_layer.isValid():
                 return False, tr("Invalid backup")
             
-            # Clear current layer
+            # Clear current layer (truncate when the provider supports it)
             self.layer.startEditing()
-            all_ids = [f.id() for f in self.layer.getFeatures()]
-            self.layer.dataProvider().deleteFeatures(all_ids)
+            provider = self.layer.dataProvider()
+            if provider.capabilities() & QgsVectorDataProvider.FastTruncate:
+                provider.truncate()
+            else:
+                request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+                request.setNoAttributes()
+                all_ids = [f.id() for f in self.layer.getFeatures(request)]
+                provider.deleteFeatures(all_ids)
             
             # Restore features
             features = list(backup_layer.getFeatures())
@@ -221,17 +264,29 @@ class LayerCorrector:
         
         try:
             to_delete = []
+            values_set = set(values)
             id_field = self.id_field
+            id_idx = self.layer.fields().indexOf(id_field) if id_field else -1
             
-            if id_field and id_field in [f.name() for f in self.layer.fields()]:
-                # Delete by attribute value
-                for feat in self.layer.getFeatures():
-                    if str(feat[id_field]) in values:
+            if id_idx >= 0:
+                # Delete by attribute value: let the provider evaluate the filter
+                column = QgsExpression.quotedColumnRef(id_field)
+                ordered_values = sorted(values_set)
+                for start in range(0, len(ordered_values), FILTER_CHUNK_SIZE):
+                    chunk = ordered_values[start:start + FILTER_CHUNK_SIZE]
+                    quoted = ",".join(QgsExpression.quotedString(v) for v in chunk)
+                    request = QgsFeatureRequest().setFilterExpression(f"{column} IN ({quoted})")
+                    request.setFlags(QgsFeatureRequest.NoGeometry)
+                    request.setNoAttributes()
+                    for feat in self.layer.getFeatures(request):
                         to_delete.append(feat.id())
             else:
-                # Delete by FID
-                for feat in self.layer.getFeatures():
-                    if str(feat.id()) in values:
+                # Delete by FID: only feature ids are needed, compared as ints
+                fid_set = {int(v) for v in values_set if str(v).lstrip('-').isdigit()}
+                request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+                request.setNoAttributes()
+                for feat in self.layer.getFeatures(request):
+                    if feat.id() in fid_set:
                         to_delete.append(feat.id())
             
             if not to_delete:
@@ -262,11 +317,13 @@ class LayerCorrector:
             log_message('error', f"Deletion error: {e}", e)
             return False, str(e)
     
-    def apply_geometry_trimming(self, trim_geometry: QgsGeometry) -> Tuple[bool, Optional[str]]:
+    def apply_geometry_trimming(self, trim_geometry: QgsGeometry,
+                                in_place: bool = False) -> Tuple[bool, Optional[str]]:
         """
         Trim layer features using geometry difference (with backup)
         
         :param trim_geometry: Geometry to subtract from features
+        :param in_place: Update geometries of the source layer instead of creating a trimmed copy
         :return: (success, error_message)
         """
         if not self.layer or not self.layer.isValid():
@@ -278,49 +335,76 @@ class LayerCorrector:
             log_message('warning', f"Proceeding without backup: {backup_err}")
         
         try:
-            crs = self.layer.crs()
-            wkb = self.layer.wkbType()
-            uri = f"{QgsWkbTypes.displayString(wkb)}?crs={crs.authid()}"
-            mem = QgsVectorLayer(uri, f"{self.layer.name()}_trimmed", "memory")
-            mem_dp = mem.dataProvider()
-            mem_dp.addAttributes(self.layer.fields())
-            mem.updateFields()
+            if in_place:
+                target = self.layer
+            else:
+                # Copy the layer natively; only trimmed geometries are rewritten below
+                target = self.layer.materialize(QgsFeatureRequest())
+                target.setName(f"{self.layer.name()}_trimmed")
             
-            feats_out = []
-            for feat in self.layer.getFeatures():
+            # Validate and prepare the cutter once for all features
+            if not trim_geometry.isGeosValid():
+                trim_geometry = trim_geometry.makeValid()
+            trim_engine = QgsGeometry.createGeometryEngine(trim_geometry.constGet())
+            trim_engine.prepareGeometry()
+            
+            # Large multipart cutters: each feature is only cut by the parts near it
+            parts = trim_geometry.asGeometryCollection() if trim_geometry.isMultipart() else []
+            part_index = None
+            if len(parts) >= TRIM_PART_INDEX_MIN_PARTS:
+                part_index = QgsSpatialIndex()
+                for part_id, part in enumerate(parts):
+                    part_index.addFeature(part_id, part.boundingBox())
+            
+            def local_cutter(g):
+                part_ids = part_index.intersects(g.boundingBox()) if part_index is not None else []
+                if not part_ids:
+                    return trim_geometry
+                if len(part_ids) == 1:
+                    return parts[part_ids[0]]
+                return QgsGeometry.collectGeometry([parts[i] for i in part_ids])
+            
+            changes = {}
+            
+            # Only features whose bbox meets the cutter's bbox can be trimmed,
+            # and only their geometry is needed
+            request = QgsFeatureRequest().setFilterRect(trim_geometry.boundingBox())
+            request.setNoAttributes()
+            
+            for feat in target.getFeatures(request):
                 g = feat.geometry()
                 if not g or g.isEmpty():
-                    feats_out.append(feat)
                     continue
                 
                 try:
-                    # Validate geometries before operation
+                    # Validate geometry before operation
                     if not g.isGeosValid():
                         g = g.makeValid()
-                    if not trim_geometry.isGeosValid():
-                        trim_geometry = trim_geometry.makeValid()
                     
-                    new_g = g.difference(trim_geometry)
+                    # Untouched by the cutter: keep geometry as is
+                    if not trim_engine.intersects(g.constGet()):
+                        continue
                     
-                    # Validate result
+                    new_g = g.difference(local_cutter(g))
                     if not new_g.isGeosValid():
                         new_g = new_g.makeValid()
+                    changes[feat.id()] = new_g
                 except Exception as geom_e:
                     log_message('warning', f"Geometry operation failed for feature {feat.id()}: {geom_e}")
-                    new_g = g
-                
-                f = QgsFeature()
-                f.setFields(mem.fields())
-                for idx, fld in enumerate(self.layer.fields()):
-                    f.setAttribute(idx, feat.attribute(fld.name()))
-                f.setGeometry(new_g)
-                feats_out.append(f)
             
-            mem_dp.addFeatures(feats_out)
-            mem.updateExtents()
-            QgsProject.instance().addMapLayer(mem)
+            # One provider call for all modified geometries
+            if changes and not target.dataProvider().changeGeometryValues(changes):
+                return False, tr("Trimming failed")
+            target.updateExtents()
+            
+            if in_place:
+                self.layer.triggerRepaint()
+                log_message('info', f"Trimmed {len(changes)} features in {self.layer.name()}")
+                return True, None
             
-            log_message('info', f"Trimmed layer created: {mem.name()}")
+            QgsProject.instance().addMapLayer(target)
+            
+            log_message('info', f"Trimmed layer created: {target.name()}")
             return True, None
             
         except Exception as e:
@@ -331,33 +415,31 @@ class LayerCorrector:
 # ==============SYMBOLOGY===============
 
 def apply_severity_symbology(layer: QgsVectorLayer):
-    """Apply graduated symbology based on severity"""
+    """Apply categorized symbology on the severity field (no attribute writes)"""
     try:
-        severity_map = {tr("Critical"): 0, tr("High"): 1, tr("Moderate"): 2, tr("Low"): 3}
-        
-        if layer.fields().indexOf('severity_num') == -1:
-            layer.dataProvider().addAttributes([QgsField("severity_num", QVariant.Int)])
-            layer.updateFields()
+        if layer.fields().indexOf('severity') == -1:
+            log_message('warning', f"No severity field on {layer.name()}, symbology not applied")
+            return
         
-        idx = layer.fields().indexOf('severity_num')
-        layer.startEditing()
-        for feat in layer.getFeatures():
-            sv = feat['severity'] if 'severity' in layer.fields().names() else ''
-            layer.changeAttributeValue(feat.id(), idx, severity_map.get(sv, 2))
-        layer.commitChanges()
-        
-        # Create ranges
-        ranges = []
+        # Create categories
+        categories = []
         colors = ["#e74c3c", "#e67e22", "#f39c12", "#27ae60"]
         labels = [tr("Critical"), tr("High"), tr("Moderate"), tr("Low")]
         
-        for i, color in enumerate(colors):
+        for color, label in zip(colors, labels):
             sym = QgsSymbol.defaultSymbol(layer.geometryType())
             sym.setColor(QColor(color))
             sym.setOpacity(0.6)
-            ranges.append(QgsRendererRange(i, i, sym, labels[i]))
+            categories.append(QgsRendererCategory(label, sym, label))
+        
+        # Catch-all for untranslated or unknown severities, drawn as Moderate
+        # (as the former graduated mapping did)
+        sym = QgsSymbol.defaultSymbol(layer.geometryType())
+        sym.setColor(QColor(colors[2]))
+        sym.setOpacity(0.6)
+        categories.append(QgsRendererCategory('', sym, tr("Other")))
         
-        renderer = QgsGraduatedSymbolRenderer('severity_num', ranges)
+        renderer = QgsCategorizedSymbolRenderer('severity', categories)
         layer.setRenderer(renderer)
         layer.triggerRepaint()
         
@@ -367,16 +449,24 @@ def apply_severity_symbology(layer: QgsVectorLayer):
 # ==================EXPORT=================
 
 def export_vector_layer(layer: QgsVectorLayer, path: str,
-                       driver: str = "GPKG", layer_name: str = None) -> Tuple[bool, Optional[str]]:
-    """Export vector layer to file"""
+                       driver: str = "GPKG", layer_name: str = None,
+                       spatial_index: bool = True) -> Tuple[bool, Optional[str]]:
+    """
+    Export vector layer to file
+    
+    :param spatial_index: Build the GPKG spatial index (skip it for files only read sequentially)
+    """
     try:
         ensure_parent_dir(path)
         transform_context = QgsProject.instance().transformContext()
         opts = QgsVectorFileWriter.SaveVectorOptions()
         opts.driverName = driver
         opts.fileEncoding = "UTF-8"
+        opts.symbologyExport = QgsVectorFileWriter.NoSymbology
         if layer_name:
             opts.layerName = layer_name
+        if driver == "GPKG" and not spatial_index:
+            opts.layerOptions = ["SPATIAL_INDEX=NO"]
         
         res, err = QgsVectorFileWriter.writeAsVectorFormatV2(layer, path, transform_context, opts)
         if res == QgsVectorFileWriter.NoError:
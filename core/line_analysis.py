@@ -9,14 +9,39 @@ License: GPLv3
 Version: 1.0.0
 """
 
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from qgis.core import (
     QgsVectorLayer, QgsFeature, QgsGeometry, QgsDistanceArea,
-    QgsWkbTypes, QgsSpatialIndex, QgsPointXY
+    QgsWkbTypes, QgsSpatialIndex, QgsPointXY, QgsFeatureRequest
 )
 from .utils import log_message, normalize_result
 from .classification import PresetManager
 
+# Endpoint keys: coordinates quantized to 1/ENDPOINT_SCALE (mm for metric CRS),
+# y packed below x in a single int; exact while |y| * ENDPOINT_SCALE < 2**39
+ENDPOINT_SCALE = 1000
+ENDPOINT_Y_SHIFT = 1 << 40
+
+
+def _intersect_coords(x1: float, y1: float, x2: float, y2: float,
+                      x3: float, y3: float, x4: float, y4: float) -> Optional[Tuple[float, float]]:
+    """
+    Intersection of segments (x1,y1)-(x2,y2) and (x3,y3)-(x4,y4) on raw floats.
+    
+    :return: (x, y) tuple if the segments cross strictly inside both, None otherwise
+    """
+    denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    if abs(denom) < 1e-10:
+        return None
+    
+    t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+    u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denom
+    
+    if 0 < t < 1 and 0 < u < 1:
+        return (x1 + t * (x2 - x1), y1 + t * (y2 - y1))
+    
+    return None
+
 
 class LineAnalyzer:
     """
@@ -43,6 +68,7 @@ class LineAnalyzer:
         self.params = params
         self.log_callback = log_callback or (lambda l, m: None)
         self.cancel_check = cancel_check or (lambda: False)
+        self._id_field_idx = {}  # layer_id -> index of the configured ID field (-1 if none)
     
     def _emit_log(self, level: str, message: str):
         """Emit log message"""
@@ -56,15 +82,29 @@ class LineAnalyzer:
     def _get_id_value(self, feature: QgsFeature, layer: QgsVectorLayer) -> str:
         """Get ID value for a feature using configured ID field"""
         layer_id = layer.id()
-        id_field = self.id_fields.get(layer_id)
+        idx = self._id_field_idx.get(layer_id)
+        if idx is None:
+            id_field = self.id_fields.get(layer_id)
+            idx = layer.fields().indexOf(id_field) if id_field else -1
+            self._id_field_idx[layer_id] = idx
         
-        if id_field and id_field in [f.name() for f in layer.fields()]:
-            value = feature[id_field]
+        if idx >= 0:
+            value = feature.attribute(idx)
             if value is not None:
                 return str(value)
         
         return str(feature.id())
     
+    def _id_request(self, layer: QgsVectorLayer) -> QgsFeatureRequest:
+        """Feature request fetching geometry plus only the configured ID field"""
+        request = QgsFeatureRequest()
+        id_field = self.id_fields.get(layer.id())
+        if id_field and layer.fields().indexOf(id_field) >= 0:
+            request.setSubsetOfAttributes([id_field], layer.fields())
+        else:
+            request.setNoAttributes()
+        return request
+    
     def analyze_self_intersections(self, layer: QgsVectorLayer) -> List[Dict[str, Any]]:
         """
         Analyze lines that intersect themselves.
@@ -76,7 +116,7 @@ class LineAnalyzer:
         results = []
         issues_found = 0
         
-        for feat in layer.getFeatures():
+        for feat in layer.getFeatures(self._id_request(layer)):
             if self.cancel_check():
                 return results
             
@@ -140,41 +180,51 @@ class LineAnalyzer:
         if len(line) < 4:
             return
         
-        for i in range(len(line) - 1):
-            for j in range(i + 2, len(line) - 1):
-                if j == i + 1:
+        # Read coordinates once; the sweep and the kernel work on plain floats
+        coords = [(p.x(), p.y()) for p in line]
+        
+        # Sweep segments by increasing min x; only segments whose x-extents
+        # (and y-extents) overlap are ever tested against each other
+        segments = []
+        for i in range(len(coords) - 1):
+            x1, y1 = coords[i]
+            x2, y2 = coords[i + 1]
+            segments.append((min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2), i))
+        segments.sort()
+        
+        found = []
+        active = []  # [(max_x, min_y, max_y, index), ...]
+        for min_x, max_x, min_y, max_y, i in segments:
+            active = [seg for seg in active if seg[0] >= min_x]
+            
+            for _, other_min_y, other_max_y, j in active:
+                if other_max_y < min_y or other_min_y > max_y:
                     continue
+                a, b = (i, j) if i < j else (j, i)
+                if b - a < 2:
+                    continue  # Adjacent segments share a vertex
                 
-                p1, p2 = line[i], line[i + 1]
-                p3, p4 = line[j], line[j + 1]
-                
-                intersection = self._segment_intersection(p1, p2, p3, p4)
+                intersection = _intersect_coords(*coords[a], *coords[a + 1], *coords[b], *coords[b + 1])
                 if intersection:
-                    intersections.append(intersection)
+                    found.append((a, b, QgsPointXY(*intersection)))
+            
+            active.append((max_x, min_y, max_y, i))
+        
+        # Report in segment order, as the pairwise scan did
+        found.sort(key=lambda item: (item[0], item[1]))
+        intersections.extend(point for _, _, point in found)
     
-    def _segment_intersection(self, p1, p2, p3, p4):
+    def _segment_intersection(self, p1: QgsPointXY, p2: QgsPointXY,
+                              p3: QgsPointXY, p4: QgsPointXY) -> Optional[QgsPointXY]:
         """
         Find intersection point of two line segments.
         
         :return: QgsPointXY if segments intersect, None otherwise
         """
-        x1, y1 = p1.x(), p1.y()
-        x2, y2 = p2.x(), p2.y()
-        x3, y3 = p3.x(), p3.y()
-        x4, y4 = p4.x(), p4.y()
-        
-        denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
-        if abs(denom) < 1e-10:
-            return None
-        
-        t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
-        u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / denom
-        
-        if 0 < t < 1 and 0 < u < 1:
-            ix = x1 + t * (x2 - x1)
-            iy = y1 + t * (y2 - y1)
-            return QgsPointXY(ix, iy)
-        
+        intersection = _intersect_coords(p1.x(), p1.y(), p2.x(), p2.y(),
+                                         p3.x(), p3.y(), p4.x(), p4.y())
+        if intersection:
+            return QgsPointXY(*intersection)
         return None
     
     def analyze_overlaps(self, layer: QgsVectorLayer) -> List[Dict[str, Any]]:
@@ -189,21 +239,19 @@ class LineAnalyzer:
         preset = self._get_preset()
         min_length = PresetManager.EPSILON_LENGTH_DEFAULT
         
-        # Build spatial index
-        index = QgsSpatialIndex()
         features_dict = {}
         
-        for feat in layer.getFeatures():
+        for feat in layer.getFeatures(self._id_request(layer)):
             if self.cancel_check():
                 return results
             if feat.hasGeometry() and not feat.geometry().isEmpty():
-                index.addFeature(feat)
                 features_dict[feat.id()] = feat
         
-        # Process features
-        processed_pairs = set()
-        overlaps_found = 0
+        # Build spatial index from the collected features in one native call
+        index = QgsSpatialIndex()
+        index.addFeatures(list(features_dict.values()))
         
+        # Process features (cid > fid makes each pair unique)
         for fid, feat_a in features_dict.items():
             if self.cancel_check():
                 return results
@@ -212,16 +260,12 @@ class LineAnalyzer:
             bbox = geom_a.boundingBox()
             
             candidate_ids = index.intersects(bbox)
+            engine_a = None  # prepared lazily, then reused for every candidate
             
             for cid in candidate_ids:
                 if cid <= fid:
                     continue
                 
-                pair_key = tuple(sorted([fid, cid]))
-                if pair_key in processed_pairs:
-                    continue
-                processed_pairs.add(pair_key)
-                
                 feat_b = features_dict.get(cid)
                 if not feat_b:
                     continue
@@ -229,8 +273,12 @@ class LineAnalyzer:
                 geom_b = feat_b.geometry()
                 
                 try:
-                    if geom_a.overlaps(geom_b):
-                        intersection = geom_a.intersection(geom_b)
+                    if engine_a is None:
+                        engine_a = QgsGeometry.createGeometryEngine(geom_a.constGet())
+                        engine_a.prepareGeometry()
+                    
+                    if engine_a.overlaps(geom_b.constGet()):
+                        intersection = QgsGeometry(engine_a.intersection(geom_b.constGet()))
                         
                         if intersection and not intersection.isEmpty():
                             # Only count line intersections (not points)
@@ -263,13 +311,12 @@ class LineAnalyzer:
                             }
                             
                             results.append(normalize_result(result))
-                            overlaps_found += 1
                             
                 except Exception as e:
                     log_message('warning', f"Line overlap test failed for {fid}/{cid}: {e}")
                     continue
         
-        self._emit_log('info', f'   → {overlaps_found} line overlaps found')
+        self._emit_log('info', f'   → {len(results)} line overlaps found')
         return results
     
     def analyze_dangles(self, layer: QgsVectorLayer) -> List[Dict[str, Any]]:
@@ -282,9 +329,10 @@ class LineAnalyzer:
         results = []
         
         # Collect all endpoints
-        endpoints = {}  # {(x, y): [(feat_id, 'start'/'end', point), ...]}
+        endpoints = {}  # {packed_xy: [(feat_id, 'start'/'end', point), ...]}
         
-        for feat in layer.getFeatures():
+        # Only geometry is needed for endpoints
+        for feat in layer.getFeatures(QgsFeatureRequest().setNoAttributes()):
             if self.cancel_check():
                 return results
             
@@ -351,13 +399,13 @@ class LineAnalyzer:
     
     def _add_endpoints(self, endpoints: Dict, feat_id: int, line: List):
         """Add line endpoints to the endpoints dictionary"""
-        start = (round(line[0].x(), 3), round(line[0].y(), 3))
-        end = (round(line[-1].x(), 3), round(line[-1].y(), 3))
+        start, end = line[0], line[-1]
+        
+        scale = ENDPOINT_SCALE
         
-        if start not in endpoints:
-            endpoints[start] = []
-        endpoints[start].append((feat_id, 'start', line[0]))
+        # Quantized points, x packed above y in a single int
+        start_key = round(start.x() * scale) * ENDPOINT_Y_SHIFT + round(start.y() * scale)
+        end_key = round(end.x() * scale) * ENDPOINT_Y_SHIFT + round(end.y() * scale)
         
-        if end not in endpoints:
-            endpoints[end] = []
-        endpoints[end].append((feat_id, 'end', line[-1]))
+        endpoints.setdefault(start_key, []).append((feat_id, 'start', start))
+        endpoints.setdefault(end_key, []).append((feat_id, 'end', end))
@@ -9,16 +9,44 @@ License: GPLv3
 Version: 1.0.0
 """
 
-from typing import List, Dict, Any, Callable
+import math
+from bisect import bisect_left
+from typing import List, Dict, Any, Callable, Tuple
 from collections import defaultdict
 from qgis.core import (
     QgsVectorLayer, QgsFeature, QgsGeometry, QgsDistanceArea,
-    QgsWkbTypes, QgsSpatialIndex, QgsRectangle, QgsPointXY
+    QgsWkbTypes, QgsSpatialIndex, QgsFeatureRequest
 )
 from .utils import log_message, normalize_result
 from .classification import PresetManager
 
 
+def _close_pairs(xs: List[float], ys: List[float], pairs: List[Tuple[int, int]],
+                 min_distance: float, max_distance: float):
+    """
+    Stream candidate pairs whose distance lies in [min_distance, max_distance].
+    
+    Thresholds are tested on squared distances; sqrt is only taken for hits.
+    
+    :return: Generator of (i, j, distance)
+    """
+    max_d2 = max_distance * max_distance
+    min_d2 = min_distance * min_distance
+    sqrt = math.sqrt
+    
+    for i, j in pairs:
+        dx = xs[i] - xs[j]
+        dy = ys[i] - ys[j]
+        d2 = dx * dx + dy * dy
+        if min_d2 <= d2 <= max_d2:
+            yield i, j, sqrt(d2)
+
+
+def _segment_json(ax: float, ay: float, bx: float, by: float) -> str:
+    """GeoJSON LineString between two points, formatted without a QgsGeometry round-trip"""
+    return f'{{"type":"LineString","coordinates":[[{ax!r},{ay!r}],[{bx!r},{by!r}]]}}'
+
+
 class PointAnalyzer:
     """
     Point analysis including:
@@ -43,6 +71,7 @@ class PointAnalyzer:
         self.params = params
         self.log_callback = log_callback or (lambda l, m: None)
         self.cancel_check = cancel_check or (lambda: False)
+        self._id_field_idx = {}  # layer_id -> index of the configured ID field (-1 if none)
     
     def _emit_log(self, level: str, message: str):
         """Emit log message"""
@@ -56,10 +85,14 @@ class PointAnalyzer:
     def _get_id_value(self, feature: QgsFeature, layer: QgsVectorLayer) -> str:
         """Get ID value for a feature using configured ID field"""
         layer_id = layer.id()
-        id_field = self.id_fields.get(layer_id)
+        idx = self._id_field_idx.get(layer_id)
+        if idx is None:
+            id_field = self.id_fields.get(layer_id)
+            idx = layer.fields().indexOf(id_field) if id_field else -1
+            self._id_field_idx[layer_id] = idx
         
-        if id_field and id_field in [f.name() for f in layer.fields()]:
-            value = feature[id_field]
+        if idx >= 0:
+            value = feature.attribute(idx)
             if value is not None:
                 return str(value)
         
@@ -78,89 +111,135 @@ class PointAnalyzer:
         max_distance = self.params.get('max_point_distance', 10.0)
         min_distance = self.params.get('min_point_distance', PresetManager.EPSILON_DIST_DEFAULT)
         
-        # Build spatial index
-        index = QgsSpatialIndex()
-        features_dict = {}
+        # Load points once: features plus flat coordinate lists.
+        # Only the configured ID field is read (for _get_id_value)
+        request = QgsFeatureRequest()
+        id_field = self.id_fields.get(layer.id())
+        if id_field and layer.fields().indexOf(id_field) >= 0:
+            request.setSubsetOfAttributes([id_field], layer.fields())
+        else:
+            request.setNoAttributes()
         
-        for feat in layer.getFeatures():
+        feats = []
+        xs = []
+        ys = []
+        
+        for feat in layer.getFeatures(request):
             if self.cancel_check():
                 return results
-            if feat.hasGeometry() and not feat.geometry().isEmpty():
-                index.addFeature(feat)
-                features_dict[feat.id()] = feat
+            geom = feat.geometry()
+            if feat.hasGeometry() and not geom.isEmpty():
+                # Read XY from the underlying QgsPoint (no QgsPointXY copy)
+                point = geom.constGet()
+                feats.append(feat)
+                xs.append(point.x())
+                ys.append(point.y())
+        
+        # Severity lookup resolved once (translated labels included)
+        breakpoints, labels = PresetManager.get_proximity_thresholds(preset)
+        bulk_classify = breakpoints == sorted(breakpoints)
         
-        # Process features
-        processed_pairs = set()
+        # Fields shared by every hit, built once
+        layer_id = layer.id()
+        base_row = {
+            'type': 'point_proximity',
+            'anomaly': 'point_proximity',
+            'layer_a_id': layer_id,
+            'layer_b_id': layer_id,
+            'area_m2': 0.0,
+            'ratio': 0.0,
+            'ratio_percent': 0.0
+        }
+        
+        # Process pairs within [min_distance, max_distance], streamed
         proximity_found = 0
+        pairs = self._proximity_pairs(xs, ys, max_distance)
         
-        for fid, feat_a in features_dict.items():
+        for i, j, distance in _close_pairs(xs, ys, pairs, min_distance, max_distance):
             if self.cancel_check():
                 return results
             
-            geom_a = feat_a.geometry()
-            point_a = geom_a.asPoint()
+            # Report each pair with the lower feature id first
+            if feats[i].id() > feats[j].id():
+                i, j = j, i
+            feat_a, feat_b = feats[i], feats[j]
+            fid, cid = feat_a.id(), feat_b.id()
             
-            # Search in buffer around point
-            search_rect = QgsRectangle(
-                point_a.x() - max_distance, point_a.y() - max_distance,
-                point_a.x() + max_distance, point_a.y() + max_distance
-            )
-            candidate_ids = index.intersects(search_rect)
-            
-            for cid in candidate_ids:
-                if cid <= fid:
-                    continue
-                
-                pair_key = tuple(sorted([fid, cid]))
-                if pair_key in processed_pairs:
-                    continue
-                processed_pairs.add(pair_key)
-                
-                feat_b = features_dict.get(cid)
-                if not feat_b:
-                    continue
+            try:
+                if bulk_classify and distance >= min_distance:
+                    severity = labels[bisect_left(breakpoints, distance)]
+                else:
+                    severity = PresetManager.classify_point_proximity(
+                        distance, preset, min_distance
+                    )
                 
-                geom_b = feat_b.geometry()
-                point_b = geom_b.asPoint()
+                # Row already carries every normalized key: one dict per hit,
+                # no normalize_result() copy
+                results.append(dict(
+                    base_row,
+                    id_a=str(fid),
+                    id_b=str(cid),
+                    id_a_real=self._get_id_value(feat_a, layer),
+                    id_b_real=self._get_id_value(feat_b, layer),
+                    measure=distance,
+                    severity=severity,
+                    geometry_json=_segment_json(xs[i], ys[i], xs[j], ys[j])
+                ))
+                proximity_found += 1
                 
-                try:
-                    distance = point_a.distance(point_b)
-                    
-                    if min_distance <= distance <= max_distance:
-                        severity = PresetManager.classify_point_proximity(
-                            distance, preset, min_distance
-                        )
-                        
-                        line_geom = QgsGeometry.fromPolylineXY([
-                            QgsPointXY(point_a), QgsPointXY(point_b)
-                        ])
-                        
-                        result = {
-                            'type': 'point_proximity',
-                            'anomaly': 'point_proximity',
-                            'id_a': str(fid),
-                            'id_b': str(cid),
-                            'id_a_real': self._get_id_value(feat_a, layer),
-                            'id_b_real': self._get_id_value(feat_b, layer),
-                            'layer_a_id': layer.id(),
-                            'layer_b_id': layer.id(),
-                            'measure': distance,
-                            'area_m2': 0.0,
-                            'severity': severity,
-                            'geometry_json': line_geom.asJson(),
-                            'ratio': 0.0,
-                            'ratio_percent': 0.0
-                        }
-                        
-                        results.append(normalize_result(result))
-                        proximity_found += 1
-                        
-                except Exception as e:
-                    log_message('warning', f"Point proximity test failed for {fid}/{cid}: {e}")
-                    continue
+            except Exception as e:
+                log_message('warning', f"Point proximity test failed for {fid}/{cid}: {e}")
+                continue
         
         self._emit_log('info', f'   → {proximity_found} proximity issues found')
         return results
+    
+    def _proximity_pairs(self, xs: List[float], ys: List[float],
+                         max_distance: float) -> List[Tuple[int, int]]:
+        """
+        Candidate point pairs closer than max_distance.
+        
+        Uses scipy's cKDTree (one native call) when available, otherwise a
+        uniform grid of max_distance cells: each cell is only compared with
+        itself and its 4 forward neighbours, so every pair is seen once.
+        
+        :param xs: Point X coordinates
+        :param ys: Point Y coordinates
+        :param max_distance: Search radius
+        :return: Sorted list of (i, j) position pairs with i < j
+        """
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            cKDTree = None
+        
+        if cKDTree is not None and xs:
+            tree = cKDTree(list(zip(xs, ys)))
+            return sorted(tree.query_pairs(max_distance))
+        
+        cell = max_distance if max_distance > 0 else 1.0
+        floor = math.floor
+        grid = defaultdict(list)
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            grid[(floor(x / cell), floor(y / cell))].append(i)
+        
+        pairs = []
+        for (cx, cy), members in grid.items():
+            if self.cancel_check():
+                break
+            # Same cell: positions were appended in increasing order
+            for k, i in enumerate(members):
+                pairs.extend((i, j) for j in members[k + 1:])
+            # Forward neighbours (E, NE, N, SE) so no cell pair is visited twice
+            for key in ((cx + 1, cy - 1), (cx + 1, cy), (cx + 1, cy + 1), (cx, cy + 1)):
+                others = grid.get(key)
+                if not others:
+                    continue
+                for i in members:
+                    pairs.extend((i, j) if i < j else (j, i) for j in others)
+        
+        pairs.sort()
+        return pairs
 
 
 class CadastralPointPolygonAnalyzer:
@@ -181,34 +260,102 @@ class CadastralPointPolygonAnalyzer:
         self.params = params
         self.log_callback = log_callback or (lambda l, m: None)
         self.cancel_check = cancel_check or (lambda: False)
+        self._vertex_cache = {}  # (layer_id, fid) -> polygon vertex (x, y) tuples, shared by all checks
+        self._feature_cache = {}  # layer_id -> features read once, shared by all checks
     
     def _emit_log(self, level: str, message: str):
         self.log_callback(level, message)
     
-    def _get_polygon_vertices(self, geom: QgsGeometry) -> List:
-        """Extract vertices from polygon geometry, excluding closing vertex"""
+    def clear_cache(self):
+        """Drop features and vertices cached during a cadastral analysis run"""
+        self._vertex_cache.clear()
+        self._feature_cache.clear()
+    
+    def _layer_features(self, layer: QgsVectorLayer) -> List[QgsFeature]:
+        """
+        Features of a layer (geometry + configured ID field only), read from the
+        provider once per analysis run and reused by every check.
+        """
+        features = self._feature_cache.get(layer.id())
+        if features is not None:
+            return features
+        
+        request = QgsFeatureRequest()
+        id_field = self.id_fields.get(layer.id())
+        if id_field and layer.fields().indexOf(id_field) >= 0:
+            request.setSubsetOfAttributes([id_field], layer.fields())
+        else:
+            request.setNoAttributes()
+        
+        features = []
+        for feat in layer.getFeatures(request):
+            if self.cancel_check():
+                return features  # Partial read: not cached
+            features.append(feat)
+        
+        self._feature_cache[layer.id()] = features
+        return features
+    
+    def _get_polygon_vertices_cached(self, layer: QgsVectorLayer,
+                                     feat: QgsFeature) -> List[Tuple[float, float]]:
+        """
+        Polygon vertex coordinates of a feature as plain (x, y) tuples,
+        decomposed once per analysis run (no QgsPointXY wrappers).
+        """
+        key = (layer.id(), feat.id())
+        vertices = self._vertex_cache.get(key)
+        if vertices is None:
+            vertices = self._get_polygon_vertices(feat.geometry())
+            self._vertex_cache[key] = vertices
+        return vertices
+    
+    def _get_polygon_vertices(self, geom: QgsGeometry) -> List[Tuple[float, float]]:
+        """Extract (x, y) exterior ring vertices from polygon geometry, excluding closing vertex"""
         vertices = []
         if not geom or geom.isEmpty():
             return vertices
         
-        geom_type = geom.wkbType()
         try:
-            if QgsWkbTypes.isMultiType(geom_type):
-                multi = geom.asMultiPolygon()
-                if multi:
-                    for polygon in multi:
-                        if polygon and polygon[0]:
-                            ring = polygon[0]
-                            vertices.extend(ring[:-1] if len(ring) > 1 else ring)
+            # Read exterior rings in place: no asPolygon() copy of every ring
+            polygon = geom.constGet()
+            if QgsWkbTypes.isMultiType(geom.wkbType()):
+                parts = [polygon.geometryN(i) for i in range(polygon.numGeometries())]
             else:
-                poly = geom.asPolygon()
-                if poly and poly[0]:
-                    ring = poly[0]
-                    vertices = list(ring[:-1] if len(ring) > 1 else ring)
+                parts = [polygon]
+            for part in parts:
+                ring = part.exteriorRing()
+                if ring is None:
+                    continue
+                n = ring.numPoints()
+                if n > 1:
+                    n -= 1
+                vertices.extend((ring.xAt(i), ring.yAt(i)) for i in range(n))
         except Exception as e:
             log_message('warning', f"Error extracting vertices: {e}")
         return vertices
     
+    @staticmethod
+    def _build_vertex_grid(vertices: List[Tuple[float, float]],
+                           cell: float) -> Dict[Tuple[int, int], List[Tuple[float, float]]]:
+        """Bucket (x, y) vertex coordinates into square cells of size cell"""
+        grid = defaultdict(list)
+        floor = math.floor
+        for x, y in vertices:
+            grid[(floor(x / cell), floor(y / cell))].append((x, y))
+        return grid
+    
+    @staticmethod
+    def _near_vertex(grid: Dict[Tuple[int, int], List[Tuple[float, float]]],
+                     x: float, y: float, cell: float, tol2: float) -> bool:
+        """True if a gridded vertex lies within sqrt(tol2) <= cell of (x, y)"""
+        cx, cy = math.floor(x / cell), math.floor(y / cell)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for vx, vy in grid.get((gx, gy), ()):
+                    if (x - vx) * (x - vx) + (y - vy) * (y - vy) <= tol2:
+                        return True
+        return False
+    
     def check_id_matching(self, point_layer: QgsVectorLayer, 
                          polygon_layer: QgsVectorLayer) -> List[Dict[str, Any]]:
         """Check 1: Points must have matching polygon IDs"""
@@ -221,21 +368,24 @@ class CadastralPointPolygonAnalyzer:
             self._emit_log('warning', '   ⚠️ ID fields not configured - skipping ID matching')
             return results
         
+        point_idx = point_layer.fields().indexOf(point_id_field)
+        poly_idx = polygon_layer.fields().indexOf(poly_id_field)
+        
         # Collect polygon IDs
         polygon_ids = set()
-        for feat in polygon_layer.getFeatures():
+        for feat in self._layer_features(polygon_layer):
             if self.cancel_check():
                 return results
-            pid = feat[poly_id_field]
+            pid = feat.attribute(poly_idx)
             if pid is not None:
                 polygon_ids.add(str(pid))
         
         # Check point IDs
         orphan_points = 0
-        for feat in point_layer.getFeatures():
+        for feat in self._layer_features(point_layer):
             if self.cancel_check():
                 return results
-            point_id = feat[point_id_field]
+            point_id = feat.attribute(point_idx)
             if point_id is None:
                 continue
             
@@ -274,22 +424,25 @@ class CadastralPointPolygonAnalyzer:
             self._emit_log('warning', '   ⚠️ ID fields not configured - skipping vertex count check')
             return results
         
+        point_idx = point_layer.fields().indexOf(point_id_field)
+        poly_idx = polygon_layer.fields().indexOf(poly_id_field)
+        
         # Count points per polygon ID
         points_per_id = {}
-        for feat in point_layer.getFeatures():
+        for feat in self._layer_features(point_layer):
             if self.cancel_check():
                 return results
-            pid = feat[point_id_field]
+            pid = feat.attribute(point_idx)
             if pid is not None:
                 pid_str = str(pid)
                 points_per_id[pid_str] = points_per_id.get(pid_str, 0) + 1
         
         # Check polygon vertex counts
         mismatches = 0
-        for feat in polygon_layer.getFeatures():
+        for feat in self._layer_features(polygon_layer):
             if self.cancel_check():
                 return results
-            poly_id = feat[poly_id_field]
+            poly_id = feat.attribute(poly_idx)
             if poly_id is None:
                 continue
             
@@ -298,7 +451,7 @@ class CadastralPointPolygonAnalyzer:
             if not geom or geom.isEmpty():
                 continue
             
-            vertices = self._get_polygon_vertices(geom)
+            vertices = self._get_polygon_vertices_cached(polygon_layer, feat)
             expected_count = len(vertices)
             actual_count = points_per_id.get(poly_id_str, 0)
             
@@ -333,28 +486,34 @@ class CadastralPointPolygonAnalyzer:
         point_id_field = self.id_fields.get(point_layer.id())
         poly_id_field = self.id_fields.get(polygon_layer.id())
         tolerance = 0.001  # 1mm
+        tol2 = tolerance * tolerance
         
         if not point_id_field or not poly_id_field:
             self._emit_log('warning', '   ⚠️ ID fields not configured - skipping coordinate check')
             return results
         
+        point_idx = point_layer.fields().indexOf(point_id_field)
+        poly_idx = polygon_layer.fields().indexOf(poly_id_field)
+        
         # Index points by polygon ID
         points_by_id = defaultdict(list)
-        for feat in point_layer.getFeatures():
+        for feat in self._layer_features(point_layer):
             if self.cancel_check():
                 return results
-            pid = feat[point_id_field]
+            pid = feat.attribute(point_idx)
             if pid is not None and feat.hasGeometry():
-                pt = feat.geometry().asPoint()
+                pt = feat.geometry().constGet()
                 points_by_id[str(pid)].append((pt.x(), pt.y(), feat))
         
         # Check polygon vertices
         mismatches_found = 0
-        for poly_feat in polygon_layer.getFeatures():
+        for poly_feat in self._layer_features(polygon_layer):
             if self.cancel_check():
                 return results
             
-            poly_id = str(poly_feat[poly_id_field]) if poly_feat[poly_id_field] else None
+            # Polygons without points are skipped before any geometry access
+            poly_value = poly_feat.attribute(poly_idx)
+            poly_id = str(poly_value) if poly_value else None
             if not poly_id or poly_id not in points_by_id:
                 continue
             
@@ -363,17 +522,14 @@ class CadastralPointPolygonAnalyzer:
                 continue
             
             try:
-                vertices = self._get_polygon_vertices(geom)
-                vertex_coords = [(v.x(), v.y()) for v in vertices]
+                vertices = self._get_polygon_vertices_cached(polygon_layer, poly_feat)
+                vertex_grid = self._build_vertex_grid(vertices, tolerance)
             except Exception as e:
                 log_message('warning', f"Failed to extract vertices for polygon {poly_id}: {e}")
                 continue
             
             for x, y, point_feat in points_by_id[poly_id]:
-                matched = any(
-                    ((x - vx)**2 + (y - vy)**2)**0.5 <= tolerance
-                    for vx, vy in vertex_coords
-                )
+                matched = self._near_vertex(vertex_grid, x, y, tolerance, tol2)
                 
                 if not matched:
                     mismatches_found += 1
@@ -403,22 +559,34 @@ class CadastralPointPolygonAnalyzer:
         """Check 4: Adjacent polygons must share vertices at common boundaries"""
         results = []
         poly_id_field = self.id_fields.get(polygon_layer.id())
+        poly_idx = polygon_layer.fields().indexOf(poly_id_field) if poly_id_field else -1
         tolerance = 0.001
         
-        # Build spatial index
+        # Build spatial index (and keep plain bbox tuples for cheap pair rejection)
         index = QgsSpatialIndex()
         poly_dict = {}
+        bboxes = {}
         
-        for feat in polygon_layer.getFeatures():
+        for feat in self._layer_features(polygon_layer):
             if self.cancel_check():
                 return results
             if feat.hasGeometry() and not feat.geometry().isEmpty():
                 index.addFeature(feat)
                 poly_dict[feat.id()] = feat
+                rect = feat.geometry().boundingBox()
+                bboxes[feat.id()] = (rect.xMinimum(), rect.yMinimum(), rect.xMaximum(), rect.yMaximum())
+        
+        # Check pairs (cid > fid makes each pair unique)
+        pairs_checked = 0
+        vertex_keys = {}  # fid -> {(round(x, 3), round(y, 3)), ...}, built once per polygon
         
-        # Check pairs
-        checked_pairs = set()
-        issues_found = 0
+        def rounded_vertices(feat: QgsFeature) -> set:
+            keys = vertex_keys.get(feat.id())
+            if keys is None:
+                keys = {(round(x, 3), round(y, 3))
+                        for x, y in self._get_polygon_vertices_cached(polygon_layer, feat)}
+                vertex_keys[feat.id()] = keys
+            return keys
         
         for fid, poly_feat in poly_dict.items():
             if self.cancel_check():
@@ -426,41 +594,45 @@ class CadastralPointPolygonAnalyzer:
             
             geom = poly_feat.geometry()
             candidates = index.intersects(geom.boundingBox())
+            engine = None  # prepared lazily, then reused for every neighbour
             
             for cid in candidates:
-                if cid == fid:
-                    continue
-                
-                pair_key = tuple(sorted([fid, cid]))
-                if pair_key in checked_pairs:
+                # Each unordered pair is visited once, from its lower fid
+                if cid <= fid:
                     continue
-                checked_pairs.add(pair_key)
+                pairs_checked += 1
                 
                 neighbor_feat = poly_dict.get(cid)
                 if not neighbor_feat:
                     continue
                 
+                # Boxes meeting only at a corner: the shared boundary is at most
+                # a point, so skip the GEOS touches/intersection calls
+                ax0, ay0, ax1, ay1 = bboxes[fid]
+                bx0, by0, bx1, by1 = bboxes[cid]
+                if min(ax1, bx1) <= max(ax0, bx0) and min(ay1, by1) <= max(ay0, by0):
+                    continue
+                
                 neighbor_geom = neighbor_feat.geometry()
                 
                 try:
-                    if geom.touches(neighbor_geom):
-                        boundary = geom.intersection(neighbor_geom)
+                    if engine is None:
+                        engine = QgsGeometry.createGeometryEngine(geom.constGet())
+                        engine.prepareGeometry()
+                    
+                    if engine.touches(neighbor_geom.constGet()):
+                        boundary = QgsGeometry(engine.intersection(neighbor_geom.constGet()))
                         if not boundary or boundary.isEmpty():
                             continue
                         
                         try:
-                            if boundary.length() < 0.001:
+                            if boundary.length() < tolerance:
                                 continue
                         except:
                             continue
                         
-                        vertices_a = set()
-                        for v in self._get_polygon_vertices(geom):
-                            vertices_a.add((round(v.x(), 3), round(v.y(), 3)))
-                        
-                        vertices_b = set()
-                        for v in self._get_polygon_vertices(neighbor_geom):
-                            vertices_b.add((round(v.x(), 3), round(v.y(), 3)))
+                        vertices_a = rounded_vertices(poly_feat)
+                        vertices_b = rounded_vertices(neighbor_feat)
                         
                         boundary_points = []
                         if boundary.type() == QgsWkbTypes.LineGeometry:
@@ -472,22 +644,19 @@ class CadastralPointPolygonAnalyzer:
                         
                         unshared_points = []
                         for bp in boundary_points:
-                            in_a = any(abs(bp.x() - va[0]) < tolerance and abs(bp.y() - va[1]) < tolerance 
-                                      for va in vertices_a)
-                            in_b = any(abs(bp.x() - vb[0]) < tolerance and abs(bp.y() - vb[1]) < tolerance 
-                                      for vb in vertices_b)
-                            if not (in_a and in_b):
+                            # Same mm rounding as the vertex keys: O(1) set lookups
+                            key = (round(bp.x(), 3), round(bp.y(), 3))
+                            if key not in vertices_a or key not in vertices_b:
                                 unshared_points.append(bp)
                         
                         if unshared_points:
-                            issues_found += 1
                             result = {
                                 'type': 'shared_vertex_missing',
                                 'anomaly': 'shared_vertex_missing',
                                 'id_a': str(fid),
-                                'id_a_real': str(poly_feat[poly_id_field]) if poly_id_field else str(fid),
+                                'id_a_real': str(poly_feat.attribute(poly_idx)) if poly_idx >= 0 else str(fid),
                                 'id_b': str(cid),
-                                'id_b_real': str(neighbor_feat[poly_id_field]) if poly_id_field else str(cid),
+                                'id_b_real': str(neighbor_feat.attribute(poly_idx)) if poly_idx >= 0 else str(cid),
                                 'layer_a_id': polygon_layer.id(),
                                 'layer_b_id': polygon_layer.id(),
                                 'measure': len(unshared_points),
@@ -503,5 +672,5 @@ class CadastralPointPolygonAnalyzer:
                     log_message('warning', f"Shared vertex check failed for {fid}/{cid}: {e}")
                     continue
         
-        self._emit_log('info', f'   → {len(checked_pairs)} pairs checked, {issues_found} issues found')
+        self._emit_log('info', f'   → {pairs_checked} pairs checked, {len(results)} issues found')
         return results
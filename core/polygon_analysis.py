@@ -9,15 +9,38 @@ License: GPLv3
 Version: 1.0.0
 """
 
-from typing import List, Dict, Any, Callable, Optional
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from qgis.core import (
     QgsVectorLayer, QgsFeature, QgsGeometry, QgsDistanceArea,
-    QgsWkbTypes, QgsSpatialIndex
+    QgsWkbTypes, QgsSpatialIndex, QgsFeatureRequest, QgsPointXY
 )
 from .utils import log_message, normalize_result
 from .classification import PresetManager
 
 
+MAX_LOGGED_PAIR_FAILURES = 10  # per analysis run; later failures are only counted
+
+# DE-9IM patterns for two polygons (A relate B)
+DE9IM_CONTAINS = 'T*****FF*'
+DE9IM_WITHIN = 'T*F**F***'
+DE9IM_OVERLAPS = 'T*T***T**'
+
+
+def _de9im_matches(matrix: str, pattern: str) -> bool:
+    """True if a DE-9IM matrix string (e.g. '212101212') matches pattern"""
+    if len(matrix) != 9:
+        return False
+    for value, expected in zip(matrix, pattern):
+        if expected == '*':
+            continue
+        if expected == 'T':
+            if value == 'F':
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
 class PolygonAnalyzer:
     """
     Polygon overlap analysis using OGC-compliant overlaps() method.
@@ -25,6 +48,7 @@ class PolygonAnalyzer:
     Key difference from intersects():
     - overlaps() returns TRUE only for real surface overlaps
     - Adjacent polygons that only touch boundaries are NOT counted
+    - Containment (where overlaps() is FALSE) is tested explicitly
     """
     
     def __init__(self, da: QgsDistanceArea, id_fields: Dict[str, str],
@@ -45,11 +69,26 @@ class PolygonAnalyzer:
         self.log_callback = log_callback or (lambda l, m: None)
         self.cancel_check = cancel_check or (lambda: False)
         self.results = []
+        self._pair_failures = 0
+        self._use_planar = not da.willUseEllipsoid()  # areas are plain GEOS areas
+        self._id_field_idx = {}  # layer_id -> index of the configured ID field (-1 if none)
     
     def _emit_log(self, level: str, message: str):
         """Emit log message"""
         self.log_callback(level, message)
     
+    def _log_pair_failure(self, message: str):
+        """Log a failed pair test; past MAX_LOGGED_PAIR_FAILURES per run they are only counted"""
+        self._pair_failures += 1
+        if self._pair_failures <= MAX_LOGGED_PAIR_FAILURES:
+            log_message('warning', message)
+    
+    def _log_suppressed_failures(self):
+        """Summarize pair failures that were counted but not logged"""
+        suppressed = self._pair_failures - MAX_LOGGED_PAIR_FAILURES
+        if suppressed > 0:
+            log_message('warning', f"{suppressed} more overlap test failures not logged")
+    
     def _get_preset(self):
         """Get classification preset from params"""
         profile_name = self.params.get('business_profile', 'Land Registry/Cadastre (GPS ±2m)')
@@ -58,24 +97,109 @@ class PolygonAnalyzer:
     def _get_id_value(self, feature: QgsFeature, layer: QgsVectorLayer) -> str:
         """Get ID value for a feature using configured ID field"""
         layer_id = layer.id()
-        id_field = self.id_fields.get(layer_id)
+        idx = self._id_field_idx.get(layer_id)
+        if idx is None:
+            id_field = self.id_fields.get(layer_id)
+            idx = layer.fields().indexOf(id_field) if id_field else -1
+            self._id_field_idx[layer_id] = idx
         
-        if id_field and id_field in [f.name() for f in layer.fields()]:
-            value = feature[id_field]
+        if idx >= 0:
+            value = feature.attribute(idx)
             if value is not None:
                 return str(value)
         
         return str(feature.id())
     
+    def _id_request(self, layer: QgsVectorLayer, extra_fields: List[str] = None) -> QgsFeatureRequest:
+        """
+        Feature request fetching geometry plus only the configured ID field.
+        
+        :param layer: Layer to read
+        :param extra_fields: Other field names the caller needs
+        :return: Feature request
+        """
+        fields = layer.fields()
+        names = [name for name in (extra_fields or []) if fields.indexOf(name) >= 0]
+        id_field = self.id_fields.get(layer.id())
+        if id_field and fields.indexOf(id_field) >= 0:
+            names.append(id_field)
+        
+        request = QgsFeatureRequest()
+        if names:
+            request.setSubsetOfAttributes(names, fields)
+        else:
+            request.setNoAttributes()
+        return request
+    
     def _safe_area(self, geom: QgsGeometry) -> float:
         """Calculate area safely"""
         try:
             if geom and not geom.isEmpty():
+                if self._use_planar:
+                    return geom.area()
                 return self.da.measureArea(geom)
         except:
             pass
         return 0.0
     
+    def _feature_area(self, areas: Dict[int, float], fid: int, geom: QgsGeometry) -> float:
+        """Area of a feature, measured on first use and then read from areas"""
+        area = areas.get(fid)
+        if area is None:
+            area = areas[fid] = self._safe_area(geom)
+        return area
+    
+    def _below_min_area(self, geom: QgsGeometry, min_area: float) -> bool:
+        """Cheap bbox test: True if the planar area of geom is certainly below min_area"""
+        if not self._use_planar:
+            return False
+        bbox = geom.boundingBox()
+        return bbox.width() * bbox.height() < min_area
+    
+    def _bbox_overlap_below_min_area(self, bbox_a: Tuple[float, float, float, float],
+                                     bbox_b: Tuple[float, float, float, float],
+                                     min_area: float) -> bool:
+        """Cheap bbox test: True if two features certainly share less than min_area (planar only)"""
+        if not self._use_planar:
+            return False
+        ax0, ay0, ax1, ay1 = bbox_a
+        bx0, by0, bx1, by1 = bbox_b
+        width = min(ax1, bx1) - max(ax0, bx0)
+        height = min(ay1, by1) - max(ay0, by0)
+        return width <= 0 or height <= 0 or width * height < min_area
+    
+    def _surface_intersection(self, engine_a, geom_a: QgsGeometry,
+                              geom_b: QgsGeometry) -> Optional[QgsGeometry]:
+        """
+        Intersection of two polygons sharing a surface, or None.
+        
+        Disjoint pairs are rejected by the prepared intersects() test; the
+        others get a single DE-9IM relate() that decides contains / within /
+        overlaps at once. When one polygon contains the other, the inner
+        polygon IS the intersection and is returned without running the clipper.
+        
+        :param engine_a: Prepared geometry engine of geom_a
+        :return: Intersection geometry, or None if no surface is shared
+        """
+        other = geom_b.constGet()
+        if not engine_a.intersects(other):
+            return None
+        
+        matrix = engine_a.relate(other)
+        if _de9im_matches(matrix, DE9IM_CONTAINS):
+            return geom_b
+        if _de9im_matches(matrix, DE9IM_WITHIN):
+            return geom_a
+        if _de9im_matches(matrix, DE9IM_OVERLAPS):
+            return QgsGeometry(engine_a.intersection(other))
+        return None
+    
+    @staticmethod
+    def _bbox_tuple(geom: QgsGeometry) -> Tuple[float, float, float, float]:
+        """Bounding box of geom as a plain (xmin, ymin, xmax, ymax) tuple"""
+        rect = geom.boundingBox()
+        return (rect.xMinimum(), rect.yMinimum(), rect.xMaximum(), rect.yMaximum())
+    
     def analyze_self_overlaps(self, layer: QgsVectorLayer) -> List[Dict[str, Any]]:
         """
         Analyze polygon self-overlaps using spatial index.
@@ -88,23 +212,27 @@ class PolygonAnalyzer:
         :return: List of overlap results
         """
         self.results = []
+        self._pair_failures = 0
         preset = self._get_preset()
         min_area = self.params.get('min_overlap_area', PresetManager.EPSILON_AREA_DEFAULT)
         
-        # Build spatial index
-        index = QgsSpatialIndex()
         features_dict = {}
+        bboxes = {}  # fid -> (xmin, ymin, xmax, ymax), read once for cheap pair rejection
         
-        for feat in layer.getFeatures():
+        for feat in layer.getFeatures(self._id_request(layer)):
             if self.cancel_check():
                 return self.results
             if feat.hasGeometry() and not feat.geometry().isEmpty():
-                index.addFeature(feat)
                 features_dict[feat.id()] = feat
+                bboxes[feat.id()] = self._bbox_tuple(feat.geometry())
         
-        # Process features
-        processed_pairs = set()
-        overlaps_found = 0
+        # Build spatial index from the collected features in one native call
+        index = QgsSpatialIndex()
+        index.addFeatures(list(features_dict.values()))
+        
+        # Process features (cid > fid makes each pair unique)
+        areas = {}  # fid -> feature area, measured at most once
+        pairs_checked = 0
         
         for fid, feat_a in features_dict.items():
             if self.cancel_check():
@@ -114,66 +242,73 @@ class PolygonAnalyzer:
             bbox = geom_a.boundingBox()
             
             candidate_ids = index.intersects(bbox)
+            engine_a = None  # prepared lazily, then reused for every candidate
             
             for cid in candidate_ids:
+                # Each unordered pair is visited once, from its lower fid
                 if cid <= fid:
                     continue
-                
-                pair_key = tuple(sorted([fid, cid]))
-                if pair_key in processed_pairs:
-                    continue
-                processed_pairs.add(pair_key)
+                pairs_checked += 1
                 
                 feat_b = features_dict.get(cid)
                 if not feat_b:
                     continue
                 
+                # Shared surface is bounded by the bbox overlap: reject before GEOS
+                if self._bbox_overlap_below_min_area(bboxes[fid], bboxes[cid], min_area):
+                    continue
+                
                 geom_b = feat_b.geometry()
                 
                 try:
-                    # Use overlaps() instead of intersects()
-                    if geom_a.overlaps(geom_b):
-                        intersection = geom_a.intersection(geom_b)
+                    if engine_a is None:
+                        engine_a = QgsGeometry.createGeometryEngine(geom_a.constGet())
+                        engine_a.prepareGeometry()
+                    
+                    # Use overlaps() (plus containment) instead of intersects()
+                    intersection = self._surface_intersection(engine_a, geom_a, geom_b)
+                    if intersection and not intersection.isEmpty():
+                        # Filter: only surfaces count as overlaps
+                        if intersection.type() != QgsWkbTypes.PolygonGeometry:
+                            continue
+                        
+                        if self._below_min_area(intersection, min_area):
+                            continue
                         
-                        if intersection and not intersection.isEmpty():
-                            # Filter: only surfaces count as overlaps
-                            if intersection.type() != QgsWkbTypes.PolygonGeometry:
-                                continue
+                        overlap_area = self._safe_area(intersection)
+                        
+                        if overlap_area >= min_area:
+                            area_a = self._feature_area(areas, fid, geom_a)
+                            area_b = self._feature_area(areas, cid, geom_b)
+                            
+                            severity, details = PresetManager.classify_polygon_overlap(
+                                overlap_area, area_a, area_b, preset, min_area
+                            )
+                            
+                            result = {
+                                'type': 'polygon_overlap',
+                                'anomaly': 'polygon_overlap',
+                                'id_a': str(fid),
+                                'id_b': str(cid),
+                                'id_a_real': self._get_id_value(feat_a, layer),
+                                'id_b_real': self._get_id_value(feat_b, layer),
+                                'layer_a_id': layer.id(),
+                                'layer_b_id': layer.id(),
+                                'measure': overlap_area,
+                                'area_m2': overlap_area,
+                                'severity': severity,
+                                'overlap_geometry': intersection,  # serialized only when drawn
+                                **details
+                            }
                             
-                            overlap_area = self._safe_area(intersection)
+                            self.results.append(normalize_result(result))
                             
-                            if overlap_area >= min_area:
-                                area_a = self._safe_area(geom_a)
-                                area_b = self._safe_area(geom_b)
-                                
-                                severity, details = PresetManager.classify_polygon_overlap(
-                                    overlap_area, area_a, area_b, preset, min_area
-                                )
-                                
-                                result = {
-                                    'type': 'polygon_overlap',
-                                    'anomaly': 'polygon_overlap',
-                                    'id_a': str(fid),
-                                    'id_b': str(cid),
-                                    'id_a_real': self._get_id_value(feat_a, layer),
-                                    'id_b_real': self._get_id_value(feat_b, layer),
-                                    'layer_a_id': layer.id(),
-                                    'layer_b_id': layer.id(),
-                                    'measure': overlap_area,
-                                    'area_m2': overlap_area,
-                                    'severity': severity,
-                                    'geometry_json': intersection.asJson(),
-                                    **details
-                                }
-                                
-                                self.results.append(normalize_result(result))
-                                overlaps_found += 1
-                                
                 except Exception as e:
-                    log_message('warning', f"Overlap test failed for {fid}/{cid}: {e}")
+                    self._log_pair_failure(f"Overlap test failed for {fid}/{cid}: {e}")
                     continue
         
-        self._emit_log('info', f'   → {overlaps_found} overlaps found in {len(processed_pairs)} pairs checked')
+        self._log_suppressed_failures()
+        self._emit_log('info', f'   → {len(self.results)} overlaps found in {pairs_checked} pairs checked')
         return self.results
     
     def analyze_inter_layer_overlaps(self, layer: QgsVectorLayer) -> List[Dict[str, Any]]:
@@ -191,100 +326,114 @@ class PolygonAnalyzer:
         
         preset = self._get_preset()
         min_area = self.params.get('min_overlap_area', PresetManager.EPSILON_AREA_DEFAULT)
+        self._pair_failures = 0
+        
+        features_dict = {}
+        source_of = {}  # fid -> __source_layer_id
+        source_rank = {}  # __source_layer_id -> order of first appearance
+        bboxes = {}  # fid -> (xmin, ymin, xmax, ymax), read once for cheap pair rejection
         
-        # Group features by source layer
-        by_source = {}
-        for feat in layer.getFeatures():
+        for feat in layer.getFeatures(self._id_request(layer, ['__source_layer_id'])):
             if self.cancel_check():
                 return results
             source_id = feat['__source_layer_id']
-            if source_id not in by_source:
-                by_source[source_id] = []
-            by_source[source_id].append(feat)
+            source_rank.setdefault(source_id, len(source_rank))
+            if feat.hasGeometry():
+                features_dict[feat.id()] = feat
+                source_of[feat.id()] = source_id
+                bboxes[feat.id()] = self._bbox_tuple(feat.geometry())
+        
+        # One index over all collected features; each fid is tagged with its
+        # source layer, and same-source candidates are skipped at query time
+        index = QgsSpatialIndex()
+        index.addFeatures(list(features_dict.values()))
         
-        source_ids = list(by_source.keys())
         overlaps_found = 0
+        areas = {}  # fid -> feature area, measured at most once
         
-        # Compare each pair of source layers
-        for i in range(len(source_ids)):
-            for j in range(i + 1, len(source_ids)):
-                if self.cancel_check():
-                    return results
+        for fid, feat_q in features_dict.items():
+            if self.cancel_check():
+                return results
+            
+            geom_q = feat_q.geometry()
+            source_q = source_of[fid]
+            candidates = index.intersects(geom_q.boundingBox())
+            engine_q = None  # prepared lazily, then reused for every candidate
+            
+            for cid in candidates:
+                # Each unordered pair is visited once, from its lower fid
+                if cid <= fid or source_of.get(cid, source_q) == source_q:
+                    continue
                 
-                source_a = source_ids[i]
-                source_b = source_ids[j]
+                # Shared surface is bounded by the bbox overlap: reject before GEOS
+                if self._bbox_overlap_below_min_area(bboxes[fid], bboxes[cid], min_area):
+                    continue
                 
-                # Build spatial index for source_b
-                index_b = QgsSpatialIndex()
-                feats_b = {f.id(): f for f in by_source[source_b] if f.hasGeometry()}
-                for feat in feats_b.values():
-                    index_b.addFeature(feat)
+                feat_c = features_dict[cid]
+                geom_c = feat_c.geometry()
                 
-                # Query with features from source_a
-                for feat_a in by_source[source_a]:
-                    if self.cancel_check():
-                        return results
-                    
-                    if not feat_a.hasGeometry():
-                        continue
-                    
-                    geom_a = feat_a.geometry()
-                    candidates = index_b.intersects(geom_a.boundingBox())
+                try:
+                    if engine_q is None:
+                        engine_q = QgsGeometry.createGeometryEngine(geom_q.constGet())
+                        engine_q.prepareGeometry()
                     
-                    for cid in candidates:
-                        feat_b = feats_b.get(cid)
-                        if not feat_b:
+                    intersection = self._surface_intersection(engine_q, geom_q, geom_c)
+                    if intersection and not intersection.isEmpty():
+                        if intersection.type() != QgsWkbTypes.PolygonGeometry:
                             continue
                         
-                        geom_b = feat_b.geometry()
-                        
-                        try:
-                            if geom_a.overlaps(geom_b):
-                                intersection = geom_a.intersection(geom_b)
-                                
-                                if intersection and not intersection.isEmpty():
-                                    if intersection.type() != QgsWkbTypes.PolygonGeometry:
-                                        continue
-                                    
-                                    overlap_area = self._safe_area(intersection)
-                                    
-                                    if overlap_area >= min_area:
-                                        area_a = self._safe_area(geom_a)
-                                        area_b = self._safe_area(geom_b)
-                                        
-                                        severity, details = PresetManager.classify_polygon_overlap(
-                                            overlap_area, area_a, area_b, preset, min_area
-                                        )
-                                        
-                                        result = {
-                                            'type': 'inter_layer_overlap',
-                                            'anomaly': 'inter_layer_overlap',
-                                            'id_a': str(feat_a.id()),
-                                            'id_b': str(feat_b.id()),
-                                            'id_a_real': self._get_id_value(feat_a, layer),
-                                            'id_b_real': self._get_id_value(feat_b, layer),
-                                            'layer_a_id': source_a,
-                                            'layer_b_id': source_b,
-                                            'measure': overlap_area,
-                                            'area_m2': overlap_area,
-                                            'severity': severity,
-                                            'geometry_json': intersection.asJson(),
-                                            **details
-                                        }
-                                        
-                                        results.append(normalize_result(result))
-                                        overlaps_found += 1
-                                        
-                        except Exception as e:
-                            log_message('warning', f"Inter-layer test failed: {e}")
+                        if self._below_min_area(intersection, min_area):
                             continue
+                        
+                        overlap_area = self._safe_area(intersection)
+                        
+                        if overlap_area >= min_area:
+                            # A is the feature whose source layer came first
+                            if source_rank[source_q] < source_rank[source_of[cid]]:
+                                feat_a, geom_a, feat_b, geom_b = feat_q, geom_q, feat_c, geom_c
+                            else:
+                                feat_a, geom_a, feat_b, geom_b = feat_c, geom_c, feat_q, geom_q
+                            
+                            area_a = self._feature_area(areas, feat_a.id(), geom_a)
+                            area_b = self._feature_area(areas, feat_b.id(), geom_b)
+                            
+                            severity, details = PresetManager.classify_polygon_overlap(
+                                overlap_area, area_a, area_b, preset, min_area
+                            )
+                            
+                            result = {
+                                'type': 'inter_layer_overlap',
+                                'anomaly': 'inter_layer_overlap',
+                                'id_a': str(feat_a.id()),
+                                'id_b': str(feat_b.id()),
+                                'id_a_real': self._get_id_value(feat_a, layer),
+                                'id_b_real': self._get_id_value(feat_b, layer),
+                                'layer_a_id': source_of[feat_a.id()],
+                                'layer_b_id': source_of[feat_b.id()],
+                                'measure': overlap_area,
+                                'area_m2': overlap_area,
+                                'severity': severity,
+                                'overlap_geometry': intersection,  # serialized only when drawn
+                                **details
+                            }
+                            
+                            results.append(normalize_result(result))
+                            overlaps_found += 1
+                            
+                except Exception as e:
+                    self._log_pair_failure(f"Inter-layer test failed for {fid}/{cid}: {e}")
+                    continue
         
+        self._log_suppressed_failures()
         self._emit_log('info', f'   → {overlaps_found} inter-layer overlaps found')
         return results
     
     def get_polygon_vertices(self, geom: QgsGeometry) -> List:
         """
-        Extract vertices from polygon geometry, excluding closing vertex.
+        Extract exterior ring vertices from polygon geometry, excluding closing vertex.
+        
+        Rings are read in place from the abstract geometry, so interior rings
+        are never copied into Python lists.
         
         :param geom: Polygon geometry
         :return: List of vertices
@@ -294,27 +443,21 @@ class PolygonAnalyzer:
         if not geom or geom.isEmpty():
             return vertices
         
-        geom_type = geom.wkbType()
-        
         try:
-            if QgsWkbTypes.isMultiType(geom_type):
-                multi = geom.asMultiPolygon()
-                if multi:
-                    for polygon in multi:
-                        if polygon and polygon[0]:
-                            ring = polygon[0]
-                            if len(ring) > 1:
-                                vertices.extend(ring[:-1])
-                            else:
-                                vertices.extend(ring)
+            polygon = geom.constGet()
+            if QgsWkbTypes.isMultiType(geom.wkbType()):
+                parts = [polygon.geometryN(i) for i in range(polygon.numGeometries())]
             else:
-                poly = geom.asPolygon()
-                if poly and poly[0]:
-                    ring = poly[0]
-                    if len(ring) > 1:
-                        vertices = list(ring[:-1])
-                    else:
-                        vertices = list(ring)
+                parts = [polygon]
+            
+            for part in parts:
+                ring = part.exteriorRing()
+                if ring is None:
+                    continue
+                n = ring.numPoints()
+                if n > 1:
+                    n -= 1
+                vertices.extend(QgsPointXY(ring.xAt(i), ring.yAt(i)) for i in range(n))
         except Exception as e:
             log_message('warning', f"Error extracting vertices: {e}")
         
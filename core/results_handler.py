@@ -276,30 +276,39 @@ class ResultLayerBuilder:
             provider.addAttributes(fields)
             layer.updateFields()
             
-            # Add features
+            # Add features (attributes set positionally, in the field order above)
+            template = QgsFeature(layer.fields())  # copied per row, fields bound once
+            is_polygon = analysis_type == 'polygon'
             features_to_add = []
             for result, geom in valid_features:
-                feat = QgsFeature(layer.fields())
+                feat = QgsFeature(template)
                 feat.setGeometry(geom)
                 
-                feat.setAttribute('type', str(result.get('type', '')))
-                feat.setAttribute('id_a', str(result.get('id_a_real', '')))
-                feat.setAttribute('id_b', str(result.get('id_b_real', '')))
-                
                 try:
-                    feat.setAttribute('measure', float(result.get('measure', 0.0)))
+                    measure = float(result.get('measure', 0.0))
                 except:
-                    feat.setAttribute('measure', 0.0)
-                    
-                feat.setAttribute('severity', str(result.get('severity', 'Low')))
+                    measure = 0.0
                 
-                if analysis_type == 'polygon':
+                attrs = [
+                    str(result.get('type', '')),
+                    str(result.get('id_a_real', '')),
+                    str(result.get('id_b_real', '')),
+                    measure,
+                    str(result.get('severity', 'Low')),
+                ]
+                
+                if is_polygon:
+                    try:
+                        ratio_pct = float(result.get('ratio_percent', 0.0))
+                    except:
+                        ratio_pct = None
                     try:
-                        feat.setAttribute('ratio_pct', float(result.get('ratio_percent', 0.0)))
-                        feat.setAttribute('area', float(result.get('area_m2', 0.0)))
+                        area = float(result.get('area_m2', 0.0))
                     except:
-                        pass
+                        area = None
+                    attrs.extend([ratio_pct, area])
                 
+                feat.setAttributes(attrs)
                 features_to_add.append(feat)
             
             provider.addFeatures(features_to_add)
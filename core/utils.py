@@ -14,7 +14,7 @@ import traceback
 from typing import Optional, Any, Tuple, Dict
 from qgis.core import (
     QgsProject, QgsVectorLayer, QgsFeature, 
-    QgsFeatureRequest, Qgis, QgsMessageLog
+    QgsFeatureRequest, Qgis, QgsMessageLog, QgsGeometry
 )
 from qgis.PyQt.QtCore import QCoreApplication
 
@@ -279,6 +279,7 @@ RESULT_SCHEMA = {
     'severity': str,      # Critical/High/Moderate/Low
     'geometry_json': str, # GeoJSON geometry
     'geometry_wkt': str,  # WKT geometry (optional)
+    'overlap_geometry': QgsGeometry,  # Geometry object; replaces geometry_json for polygon results
 }
 
 
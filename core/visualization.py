@@ -419,7 +419,7 @@ class VisualizationManager:
             except:
                 pass
         
-        # Try overlap_geometry (legacy)
+        # Try overlap_geometry (QgsGeometry kept as-is by polygon analysis)
         overlap_geom = result.get('overlap_geometry')
         if overlap_geom and isinstance(overlap_geom, QgsGeometry):
             return overlap_geom
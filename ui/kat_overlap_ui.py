@@ -27,6 +27,9 @@ from ..core.layer_operations import merge_layers_to_temp
 from ..core.results_handler import ResultsTableManager, ResultLayerBuilder, ResultExporter
 from ..core.visualization import create_visualization_manager
 
+# Display names indexed by QgsVectorLayer.geometryType()
+GEOM_TYPE_NAMES = ("Point", "Line", "Polygon")
+
 
 class ModernKatOverlapUI(QDialog):
     """Main dialog for KAT Overlap Analysis"""
@@ -326,7 +329,8 @@ class ModernKatOverlapUI(QDialog):
                 
                 self.layers_table.setItem(row, 1, QTableWidgetItem(layer.name()))
                 
-                geom_type = {0: "Point", 1: "Line", 2: "Polygon"}.get(layer.geometryType(), "Unknown")
+                gtype = layer.geometryType()
+                geom_type = GEOM_TYPE_NAMES[gtype] if 0 <= gtype <= 2 else "Unknown"
                 self.layers_table.setItem(row, 2, QTableWidgetItem(geom_type))
                 
                 id_combo = QComboBox()
@@ -451,37 +455,38 @@ class ModernKatOverlapUI(QDialog):
     
     def get_layers_for_analysis(self) -> dict:
         """Get and merge selected layers by type"""
-        layers_by_type = {'polygon': [], 'line': [], 'point': []}
+        buckets = ([], [], [])  # indexed by geometryType(): 0=point, 1=line, 2=polygon
+        project = QgsProject.instance()
         
         for layer_id in self.selected_layers:
-            layer = QgsProject.instance().mapLayer(layer_id)
+            layer = project.mapLayer(layer_id)
             if not layer:
                 continue
             
             geom_type = layer.geometryType()
-            if geom_type == 2:
-                layers_by_type['polygon'].append(layer)
-            elif geom_type == 1:
-                layers_by_type['line'].append(layer)
-            elif geom_type == 0:
-                layers_by_type['point'].append(layer)
-        
-        result = {}
-        for geom_type, layer_list in layers_by_type.items():
-            if len(layer_list) == 0:
-                result[geom_type] = None
-            elif len(layer_list) == 1:
-                result[geom_type] = layer_list[0]
-            else:
-                merged, error = merge_layers_to_temp(layer_list, f"merged_{geom_type}")
-                if merged:
-                    result[geom_type] = merged
-                    self.log("info", tr("Merged {} {} layers").format(len(layer_list), geom_type))
-                else:
-                    self.log("error", tr("Merge failed: {}").format(error))
-                    result[geom_type] = layer_list[0]
+            if 0 <= geom_type <= 2:
+                buckets[geom_type].append(layer)
         
-        return result
+        return {
+            'polygon': self._resolve_layers('polygon', buckets[2]),
+            'line': self._resolve_layers('line', buckets[1]),
+            'point': self._resolve_layers('point', buckets[0]),
+        }
+    
+    def _resolve_layers(self, geom_type: str, layer_list: list):
+        """Return the single layer, a merged layer, or None for one geometry type"""
+        if not layer_list:
+            return None
+        if len(layer_list) == 1:
+            return layer_list[0]
+        
+        merged, error = merge_layers_to_temp(layer_list, f"merged_{geom_type}")
+        if merged:
+            self.log("info", tr("Merged {} {} layers").format(len(layer_list), geom_type))
+            return merged
+        
+        self.log("error", tr("Merge failed: {}").format(error))
+        return layer_list[0]
     
     def on_result_double_click(self, row: int, col: int):
         """Handle double-click on result row - zoom and highlight"""